@@ -3,32 +3,87 @@
 ============
 
 Utilidad de línea de comandos para convertir un PDF en un documento Word con formato
-uniforme y exportar las gráficas contenidas como imágenes PNG. El texto del
+uniforme y exportar las gráficas contenidas como imágenes (PNG o JPEG). El texto del
 DOCX resultante queda con la misma fuente, tamaño, interlineado y márgenes.
 
 Uso rápido::
 
     python pdf2word.py informe.pdf
 
-Dependencias: ``pdf2docx``, ``PyMuPDF`` y ``python-docx``.
+Dependencias: ``pdf2docx``, ``PyMuPDF``, ``python-docx`` y ``numpy``.
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import re
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from io import BytesIO
+from logging.handlers import MemoryHandler
+from operator import attrgetter
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Set, Tuple
 
-from pdf2docx import Converter  # type: ignore
 import fitz  # PyMuPDF
+import numpy as np
+import PIL
 from PIL import Image  # type: ignore
 from docx import Document  # type: ignore
+from docx.oxml import OxmlElement
 from docx.shared import Pt, Inches
 from docx.oxml.ns import qn
 from docx.enum.shape import WD_INLINE_SHAPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from lxml import etree
+
+# Upper bound for the image extraction process pool.
+_MAX_WORKERS = 8
+# Embedded codecs that can be written as-is, mapped to their ``--image-format``;
+# anything else (JBIG2, JPX...) is decoded through a Pixmap.
+_PASSTHROUGH_EXTS = {"png": "png", "jpeg": "jpeg", "jpg": "jpeg"}
+# Quality used when an image has to be encoded as JPEG.
+_JPEG_QUALITY = 85
+# Chart heuristic: fewer distinct colours than _CHART_MAX_COLORS in a
+# _THUMB_SIZE thumbnail, counted _COLOR_CHUNK_ROWS rows at a time.
+_THUMB_SIZE = (32, 32)
+_CHART_MAX_COLORS = 150
+_COLOR_CHUNK_ROWS = 8
+# Images smaller than this (in pixels) are never charts.
+_MIN_CHART_PIXELS = 64 * 64
+# Chart decisions by content digest, shared by extraction and DOCX filtering.
+_CHART_CACHE: Dict[bytes, bool] = {}
+# PyMuPDF span flags used by --fast.
+_SPAN_ITALIC = 2
+_SPAN_BOLD = 16
+# Control characters that are not allowed in WordprocessingML text.
+_XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Clark names resolved once for the XML loops below.
+_W_P = qn("w:p")
+_W_PPR = qn("w:pPr")
+_W_SECTPR = qn("w:sectPr")
+_W_R = qn("w:r")
+_W_RPR = qn("w:rPr")
+_W_B = qn("w:b")
+_W_I = qn("w:i")
+_W_T = qn("w:t")
+_W_BR = qn("w:br")
+_W_TYPE = qn("w:type")
+_W_ASCII = qn("w:ascii")
+_W_HANSI = qn("w:hAnsi")
+_W_EAST_ASIA = qn("w:eastAsia")
+_XML_SPACE = qn("xml:space")
+# Relationship id of the picture behind an InlineShape.
+_BLIP_EMBED = attrgetter("_inline.graphic.graphicData.pic.blipFill.blip.embed")
+# Large scanned pages are expected input, not decompression bombs.
+Image.MAX_IMAGE_PIXELS = None
+# Temporary tag for drawings that _filter_non_charts strips in one pass.
+_DOOMED = "{urn:pdf2word}doomed"
 
 
 def _notify(msg: str) -> None:
@@ -52,12 +107,27 @@ def _notify(msg: str) -> None:
 
 def _setup_logging(pdf: Path) -> None:
     log_file = pdf.with_name(f"{pdf.stem}_process.log")
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[logging.FileHandler(log_file, encoding="utf-8"), logging.StreamHandler()],
-    )
+    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler.setFormatter(fmt)
+    # The file gets every DEBUG record, buffered: written on errors, when the
+    # buffer fills and at exit, instead of one write per record.
+    buffered = MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=file_handler)
+    console = logging.StreamHandler()
+    console.setFormatter(fmt)
+    console.setLevel(logging.INFO)
+    # force: pdf2docx calls basicConfig() when imported and may beat us to it.
+    logging.basicConfig(level=logging.DEBUG, handlers=[buffered, console], force=True)
+    logging.getLogger("PIL").setLevel(logging.INFO)
     logging.info("=== Inicio de proceso ===")
+    if ".post" not in PIL.__version__:  # Pillow-SIMD versions end in .postN
+        logging.debug("Pillow %s sin SIMD; ver README (Rendimiento)", PIL.__version__)
+
+
+def _flush_log() -> None:
+    """Write out the records buffered by :func:`_setup_logging`."""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
 
 
 def _pick_pdf_gui() -> Path | None:
@@ -75,45 +145,276 @@ def _pick_pdf_gui() -> Path | None:
 # Conversion helpers
 # ────────────────────────────────────────────────────────────────────────
 
-def _pdf_to_word(pdf: Path) -> Path:
-    """Convert *pdf* to DOCX and return the path to the created file."""
-    word = pdf.with_suffix(".docx")
-    logging.info("Convirtiendo %s → %s", pdf.name, word.name)
+def _pdf_to_word(pdf: Path) -> bytes:
+    """Convert *pdf* to DOCX in memory and return the package bytes.
+
+    Nothing is written to disk here: :func:`_postprocess` saves the file
+    once, after formatting.
+    """
+    # Imported here: pdf2docx pulls in OpenCV and friends (~0.3 s), which the
+    # GUI-cancel path, --fast and the image workers never need.
+    from pdf2docx import Converter  # type: ignore
+
+    buf = BytesIO()
     cv = Converter(str(pdf))
-    cv.convert(str(word))
+    # pdf2docx can split the page range across processes and stitch the
+    # parsed pages into one DOCX; only worth it with a few pages per segment.
+    # cpu_count caps the segments, not its Pool(), which is os.cpu_count() wide.
+    workers = min(os.cpu_count() or 1, _MAX_WORKERS)
+    parallel = workers > 1 and len(cv.fitz_doc) >= 2 * workers
+    # Segments are handed back as pages-<i>.json in the cwd: keep concurrent
+    # runs apart in a scratch directory (*pdf* is absolute).
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            cv.convert(buf, multi_processing=parallel, cpu_count=workers)
+        finally:
+            os.chdir(cwd)
     cv.close()
-    return word
+    return buf.getvalue()
 
 
-def _looks_like_chart(img: Image.Image) -> bool:
-    """Heurística sencilla: menos de 150 colores en una miniatura."""
-    thumb = img.resize((64, 64)).convert("RGB")
-    colors = thumb.getcolors(64 * 64) or []
-    return len(colors) < 150
+def _run_converter(convert: Callable[[Path], bytes], pdf: Path) -> bytes:
+    """Run *convert* on *pdf* inside the converter process.
 
+    Pool workers exit without ``logging.shutdown()``, so the records left in
+    the ``MemoryHandler`` inherited from the parent are flushed here.
+    """
+    try:
+        return convert(pdf)
+    finally:
+        _flush_log()
+
+
+def _text_run(text: str, flags: int):
+    """Build a ``w:r`` holding *text*, bold/italic according to span *flags*."""
+    r = OxmlElement("w:r")
+    if flags & (_SPAN_BOLD | _SPAN_ITALIC):
+        rpr = etree.SubElement(r, _W_RPR)
+        if flags & _SPAN_BOLD:
+            etree.SubElement(rpr, _W_B)
+        if flags & _SPAN_ITALIC:
+            etree.SubElement(rpr, _W_I)
+    t = etree.SubElement(r, _W_T)
+    t.text = text
+    t.set(_XML_SPACE, "preserve")
+    return r
+
+
+def _pdf_to_word_fast(pdf: Path) -> bytes:
+    """Build a text-only DOCX straight from PyMuPDF text blocks.
+
+    Each text block becomes a paragraph and each span a run, keeping bold
+    and italic; pages are separated by page breaks. Unlike pdf2docx, layout
+    (columns, tables, images) is not reconstructed. Same contract as
+    :func:`_pdf_to_word`: returns the package bytes.
+    """
+    word = Document()
+    paragraphs = []
+    with fitz.open(pdf) as doc:
+        for page in doc:
+            if page.number:
+                p = OxmlElement("w:p")
+                br = etree.SubElement(etree.SubElement(p, _W_R), _W_BR)
+                br.set(_W_TYPE, "page")
+                paragraphs.append(p)
+            for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+                if block["type"] != 0:
+                    continue
+                p = OxmlElement("w:p")
+                for n, line in enumerate(block["lines"]):
+                    for i, span in enumerate(line["spans"]):
+                        text = _XML_INVALID.sub("", span["text"])
+                        if n and not i:  # lines of a block are wrapped text
+                            text = " " + text
+                        p.append(_text_run(text, span["flags"]))
+                paragraphs.append(p)
+    # A single mutation of the body, ahead of its trailing sectPr.
+    body = word.element.body
+    end = len(body) - (body.sectPr is not None)
+    body[end:end] = paragraphs
+    buf = BytesIO()
+    word.save(buf)
+    return buf.getvalue()
+
+
+def _is_tiny(size: Tuple[int, int]) -> bool:
+    """True for images below ``_MIN_CHART_PIXELS``: icons, bullets, rules."""
+    width, height = size
+    return width * height < _MIN_CHART_PIXELS
 
-def _extract_images(pdf: Path, keep_all: bool) -> List[str]:
-    """Export PNG images from *pdf*.
 
-    If ``keep_all`` is False, only images that look like charts are kept.
-    Returns the list of filenames created.
+def _looks_like_chart(img: Image.Image) -> bool:
+    """Heurística sencilla: menos de 150 colores en una miniatura."""
+    # NEAREST is enough: only colour diversity matters, not fidelity.
+    thumb = img.resize(_THUMB_SIZE, Image.NEAREST).convert("RGB")
+    rgb = np.asarray(thumb, dtype=np.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    # Photos pass the threshold within the first rows: stop counting there.
+    seen: Set[int] = set()
+    for start in range(0, packed.shape[0], _COLOR_CHUNK_ROWS):
+        seen.update(np.unique(packed[start:start + _COLOR_CHUNK_ROWS]).tolist())
+        if len(seen) >= _CHART_MAX_COLORS:
+            return False
+    return True
+
+
+def _shrink_for_chart(img: Image.Image) -> None:
+    """Shrink a freshly opened *img* in place, close to ``_THUMB_SIZE``.
+
+    JPEGs are scaled down by libjpeg while decoding (``draft``); other
+    formats are decoded and reduced with ``thumbnail``.
     """
+    if img.draft("RGB", _THUMB_SIZE) is None:
+        img.thumbnail(_THUMB_SIZE, Image.NEAREST, reducing_gap=None)
+
+
+def _chart_key(data: bytes) -> bytes:
+    """Short content digest used as ``_CHART_CACHE`` key."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _is_chart_bytes(data: bytes, key: bytes | None = None) -> bool:
+    """Whether encoded *data* is a chart to keep (not tiny, few colours), memoized."""
+    key = key or _chart_key(data)
+    if key not in _CHART_CACHE:
+        img = Image.open(BytesIO(data))  # only the header is read here
+        if _is_tiny(img.size):
+            _CHART_CACHE[key] = False
+        else:
+            _shrink_for_chart(img)
+            _CHART_CACHE[key] = _looks_like_chart(img)
+    return _CHART_CACHE[key]
+
+
+def _pixmap_to_image(pix: fitz.Pixmap) -> Image.Image:
+    """Wrap the samples of a gray/RGB *pix* in a PIL image, dropping alpha."""
+    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if pix.alpha:
+        arr = arr[..., :-1]
+    if arr.shape[2] == 1:
+        return Image.fromarray(np.ascontiguousarray(arr[..., 0]))
+    return Image.fromarray(np.ascontiguousarray(arr))
+
+
+def _extract_page_images(
+    pdf: str,
+    p_idx: int,
+    images: List[Tuple[int, int]],
+    keep_all: bool,
+    stem: str,
+    image_format: str,
+    index: Dict[str, Tuple[int, str]],
+) -> Tuple[Dict[str, Tuple[int, str]], Dict[bytes, bool]]:
+    """Export *images* of page *p_idx* in a worker; return index entries and chart decisions."""
     doc = fitz.open(pdf)
-    out: List[str] = []
-    stem = pdf.stem
-    for p_idx, page in enumerate(doc, 1):
-        for i_idx, (xref, *_rest) in enumerate(page.get_images(full=True), 1):
-            pix = fitz.Pixmap(doc, xref)
-            if pix.alpha:
-                pix = fitz.Pixmap(fitz.csRGB, pix)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            if not keep_all and not _looks_like_chart(img):
+    entries: Dict[str, Tuple[int, str]] = {}
+    decisions: Dict[bytes, bool] = {}
+    label = "img" if keep_all else "chart"
+    for i_idx, xref in images:
+        try:
+            info = doc.extract_image(xref) or {}
+        except Exception:  # stream MuPDF can't hand out raw: decode it below
+            info = {}
+        # Outputs listed in *index* with the same source stream are up to date.
+        source = _chart_key(doc.xref_stream_raw(xref) or b"").hex()
+        stored = _PASSTHROUGH_EXTS.get(info.get("ext"))
+        passthrough = stored is not None and image_format in ("auto", stored)
+        if passthrough and not keep_all:
+            data = info["image"]
+            key = _chart_key(data)
+            try:
+                decisions[key] = _is_chart_bytes(data, key)
+            except (OSError, Image.UnidentifiedImageError):  # truncated or odd stream
+                passthrough = False  # MuPDF is more forgiving: decode it below
+        if passthrough:
+            # Write the stream as stored in the PDF: no decode, no re-encode.
+            data = info["image"]
+            if not keep_all and not decisions[key]:
+                continue
+            name = f"{stem}_p{p_idx}_{label}{i_idx}.{info['ext']}"
+            entries[name] = (len(data), source)
+            if index.get(name) != entries[name]:
+                Path(name).write_bytes(data)
+            continue
+        if keep_all and image_format != "auto":
+            name = f"{stem}_p{p_idx}_{label}{i_idx}.{image_format}"
+            if name in index and index[name][1] == source:  # nothing to classify: skip the decode
+                entries[name] = index[name]
                 continue
-            label = "img" if keep_all else "chart"
-            name = f"{stem}_p{p_idx}_{label}{i_idx}.png"
-            pix.save(name)
-            out.append(name)
-            logging.info("  • %s", name)
+        pix = fitz.Pixmap(doc, xref)
+        if not keep_all and _is_tiny((pix.width, pix.height)):
+            continue
+        if pix.n - pix.alpha not in (1, 3):  # CMYK and friends
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        img = _pixmap_to_image(pix)
+        fmt = image_format
+        if not keep_all or fmt == "auto":
+            is_chart = _looks_like_chart(img)
+            if not keep_all and not is_chart:
+                continue
+            if fmt == "auto":
+                # Flat-colour graphics stay lossless; photos go to JPEG.
+                fmt = "png" if is_chart else "jpeg"
+        name = f"{stem}_p{p_idx}_{label}{i_idx}.{fmt}"
+        if name in index and index[name][1] == source:
+            entries[name] = index[name]
+            continue
+        if fmt == "png":
+            img.save(name, optimize=False, compress_level=1)
+        else:
+            img.save(name, "JPEG", quality=_JPEG_QUALITY)
+        entries[name] = (os.path.getsize(name), source)
+    doc.close()
+    return entries, decisions
+
+
+def _reusable_outputs(index_file: Path) -> Dict[str, Tuple[int, str]]:
+    """Entries of *index_file* whose output is still on disk with the recorded size."""
+    try:
+        index = {name: tuple(entry) for name, entry in json.loads(index_file.read_text(encoding="utf-8")).items()}
+    except (OSError, ValueError, TypeError, AttributeError):  # missing or damaged: export again
+        return {}
+    with os.scandir() as files:
+        sizes = {e.name: e.stat().st_size for e in files if e.name in index and e.is_file()}
+    return {name: entry for name, entry in index.items() if len(entry) == 2 and sizes.get(name) == entry[0]}
+
+
+def _extract_images(
+    doc: fitz.Document, keep_all: bool, image_format: str = "auto", reuse: bool = True
+) -> List[str]:
+    """Export the images of *doc* in page order, charts only unless *keep_all*."""
+    pdf = Path(doc.name)
+    # Listing xrefs is cheap and needs no decoding: dedupe before dispatching.
+    seen_xrefs: Set[int] = set()
+    tasks: Dict[int, List[Tuple[int, int]]] = {}
+    for page_index in range(doc.page_count):
+        for i_idx, (xref, *_rest) in enumerate(doc.get_page_images(page_index, full=True), 1):
+            if xref in seen_xrefs:
+                continue
+            seen_xrefs.add(xref)
+            tasks.setdefault(page_index + 1, []).append((i_idx, xref))
+    # name -> (size, source stream digest) of the exports, next to them.
+    index_file = Path(f".{pdf.stem}_images.json")
+    index = _reusable_outputs(index_file) if reuse else {}
+    workers = max(1, min(os.cpu_count() or 1, _MAX_WORKERS, len(tasks)))
+    per_page: Dict[int, Dict[str, Tuple[int, str]]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                _extract_page_images, str(pdf), p_idx, images, keep_all, pdf.stem, image_format, index
+            ): p_idx
+            for p_idx, images in tasks.items()
+        }
+        for fut in as_completed(futures):
+            per_page[futures[fut]], decisions = fut.result()
+            _CHART_CACHE.update(decisions)
+    entries = {name: entry for idx in sorted(per_page) for name, entry in per_page[idx].items()}
+    index_file.write_text(json.dumps({**index, **entries}), encoding="utf-8")  # other modes' too
+    out = list(entries)
+    for name in out:
+        logging.debug("  • %s", name)
     logging.info("Total imágenes exportadas: %d", len(out))
     return out
 
@@ -131,26 +432,52 @@ def _clear_header_footer(part) -> None:
 
 
 def _filter_non_charts(doc: Document) -> int:
-    """Remove inline images that don't look like charts."""
+    """Remove inline images that don't look like charts.
+
+    Doomed drawings are tagged first and stripped in a single sweep; body
+    paragraphs left with nothing but empty runs are dropped with them.
+    """
     rels = doc.part._rels
+    touched = set()
     removed = 0
-    for shp in list(doc.inline_shapes):
+    for shp in doc.inline_shapes:
         if shp.type != WD_INLINE_SHAPE.PICTURE:
             continue
-        img_bytes = rels[shp._inline.graphic.graphicData.pic.blipFill.blip.embed]._target._blob
-        if _looks_like_chart(Image.open(BytesIO(img_bytes))):
+        img_bytes = rels[_BLIP_EMBED(shp)]._target._blob
+        if _is_chart_bytes(img_bytes):
             continue
-        parent = shp._inline.getparent()
-        parent.getparent().remove(parent)
+        drawing = shp._inline.getparent()
+        drawing.tag = _DOOMED
+        touched.add(drawing.getparent().getparent())  # w:drawing → w:r → w:p
         removed += 1
+    if not removed:
+        return 0
+    body = doc.element.body
+    etree.strip_elements(body, _DOOMED, with_tail=False)
+    for p in touched:
+        if p.getparent() is body and _is_blank_paragraph(p):
+            body.remove(p)
     return removed
 
 
+def _is_blank_paragraph(p) -> bool:
+    """True if *p* has no content left besides properties and empty runs."""
+    for child in p:
+        if child.tag == _W_PPR:
+            if child.find(_W_SECTPR) is not None:
+                return False
+        elif child.tag != _W_R or any(c.tag != _W_RPR for c in child):
+            return False
+    return True
+
+
 def _apply_format(doc: Document, font: str, size: float, spacing: float, margin: float) -> None:
     normal = doc.styles["Normal"]
     normal.font.name = font
     normal.font.size = Pt(size)
-    normal._element.rPr.rFonts.set(qn("w:eastAsia"), font)
+    normal._element.rPr.rFonts.set(_W_EAST_ASIA, font)
+    normal.paragraph_format.line_spacing = spacing
+    normal.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
 
     for sect in doc.sections:
         sect.top_margin = sect.bottom_margin = Inches(margin)
@@ -159,24 +486,45 @@ def _apply_format(doc: Document, font: str, size: float, spacing: float, margin:
         _clear_header_footer(sect.footer)
 
     def _format_paragraphs(paragraphs):
+        # Normal carries the defaults: only override what would shadow it.
         for para in paragraphs:
-            para.paragraph_format.line_spacing = spacing
-            para.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            for run in para.runs:
-                run.font.name = font
-                run.font.size = Pt(size)
-                run._element.rPr.rFonts.set(qn("w:eastAsia"), font)
+            pPr = para._p.pPr
+            if pPr is not None and (pPr.pStyle is not None or pPr.spacing is not None or pPr.jc is not None):
+                para.paragraph_format.line_spacing = spacing
+                para.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
 
     _format_paragraphs(doc.paragraphs)
 
     for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                _format_paragraphs(cell.paragraphs)
+        # ``Table._cells`` resolves the grid once; merged cells repeat the same tc.
+        seen = set()
+        for cell in table._cells:
+            if cell._tc in seen:
+                continue
+            seen.add(cell._tc)
+            _format_paragraphs(cell.paragraphs)
+
+    # Runs are patched on the XML directly, table cells included, without
+    # going through python-docx's Run/Font proxies.
+    font_attrs = {_W_ASCII: font, _W_HANSI: font, _W_EAST_ASIA: font}
+    run_size = Pt(size)
+    for r in doc.element.body.iter(_W_R):
+        rPr = r.rPr
+        if rPr is None or (rPr.rFonts is None and rPr.sz is None and rPr.rStyle is None):
+            # Bare runs inherit from Normal, unless their paragraph has a style.
+            pPr = next(r.iterancestors(_W_P)).pPr
+            if pPr is None or pPr.pStyle is None:
+                continue
+            rPr = r.get_or_add_rPr()
+        rFonts = rPr.get_or_add_rFonts()
+        for attr, value in font_attrs.items():
+            rFonts.set(attr, value)
+        rPr.sz_val = run_size
 
 
-def _postprocess(docx: Path, font: str, size: float, spacing: float, margin: float, keep_charts_only: bool) -> None:
-    doc = Document(str(docx))
+def _postprocess(
+    doc: Document, docx: Path, font: str, size: float, spacing: float, margin: float, keep_charts_only: bool
+) -> None:
     _apply_format(doc, font, size, spacing, margin)
     if keep_charts_only:
         removed = _filter_non_charts(doc)
@@ -197,6 +545,22 @@ def main() -> None:
     )
     ap.add_argument("pdf", nargs="?", type=Path, help="Archivo PDF de entrada")
     ap.add_argument("--include-all-images", action="store_true", help="No filtrar imágenes")
+    ap.add_argument(
+        "--fast",
+        action="store_true",
+        help="Conversión rápida solo de texto, sin reconstruir la maquetación",
+    )
+    ap.add_argument(
+        "--image-format",
+        choices=["auto", "png", "jpeg"],
+        default="auto",
+        help="Formato de las imágenes exportadas (auto: conserva el original)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Volver a escribir las imágenes aunque ya existan de una ejecución anterior",
+    )
     ap.add_argument("--font", default="Calibri", help="Fuente a usar")
     ap.add_argument("--size", type=float, default=11, help="Tamaño de fuente (pt)")
     ap.add_argument("--spacing", type=float, default=1.0, help="Interlineado")
@@ -211,17 +575,25 @@ def main() -> None:
     pdf = pdf.resolve()
     _setup_logging(pdf)
 
+    docx = pdf.with_suffix(".docx")
     try:
-        docx = _pdf_to_word(pdf)
-        _extract_images(pdf, args.include_all_images)
-        _postprocess(docx, args.font, args.size, args.spacing, args.margin, not args.include_all_images)
+        # pdf2docx runs in its own process while the images are extracted.
+        with fitz.open(pdf) as doc, ProcessPoolExecutor(max_workers=1) as pool:
+            logging.info("Convirtiendo %s → %s", pdf.name, docx.name)
+            _flush_log()  # a forked converter would inherit and rewrite the buffer
+            conversion = pool.submit(_run_converter, _pdf_to_word_fast if args.fast else _pdf_to_word, pdf)
+            _extract_images(doc, args.include_all_images, args.image_format, not args.no_cache)
+            fitz.TOOLS.store_shrink(100)
+            word = Document(BytesIO(conversion.result()))
+        _postprocess(word, docx, args.font, args.size, args.spacing, args.margin, not args.include_all_images)
     except Exception as exc:
         logging.exception("Error inesperado: %s", exc)
         _notify("Ocurrió un error; revisa el log para detalles")
         sys.exit(2)
 
-    _notify("✓ Proceso completado. Revisa el DOCX, PNGs y log")
+    _notify("✓ Proceso completado. Revisa el DOCX, imágenes y log")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # required by PyInstaller on Windows
     main()